@@ -18,6 +18,16 @@ META_POR_CATEGORIA = {
     "gases": 100
 }
 
+COLUNAS_PONTOS = ["reciclagem", "agua_luz", "habitos", "gases", "total"]
+
+LARGURA_FAIXA = 10
+NUM_FAIXAS = 500
+MIN_USUARIOS_COMPARACAO = 5
+PERCENTIL_META = 0.75
+
+histogramas = None
+metas_semana = None
+
 ctk.set_appearance_mode("dark")
 ctk.set_default_color_theme("dark-blue")
 
@@ -41,7 +51,7 @@ if not os.path.exists(ARQUIVO_ULTIMO_RESET):
 
 def carregar_df_usuarios():
     df = pd.read_csv(ARQUIVO_USUARIOS)
-    for c in ["reciclagem", "agua_luz", "habitos", "gases", "total"]:
+    for c in COLUNAS_PONTOS:
         if c not in df.columns:
             df[c] = 0
         df[c] = pd.to_numeric(df[c], errors="coerce").fillna(0).astype(int)
@@ -57,10 +67,84 @@ def recalcular_total(df):
                    df["gases"].fillna(0).astype(int))
     return df
 
+def faixa_pontos(pontos):
+    return min(max(int(pontos), 0) // LARGURA_FAIXA, NUM_FAIXAS - 1)
+
+def reconstruir_histogramas(df):
+    # acima[i] = usuários na faixa i ou acima; acima[0] é o total de usuários.
+    # Assim a comparação com os outros usuários não precisa ordenar a tabela
+    global histogramas
+    histogramas = {}
+    for c in COLUNAS_PONTOS:
+        faixas = (df[c].clip(lower=0) // LARGURA_FAIXA).clip(upper=NUM_FAIXAS - 1)
+        contagem = faixas.value_counts().reindex(range(NUM_FAIXAS), fill_value=0)
+        histogramas[c] = [int(v) for v in contagem[::-1].cumsum()[::-1]]
+    return histogramas
+
+def zerar_histogramas(n_usuarios):
+    # Depois do reset semanal todos os usuários estão na faixa 0
+    global histogramas
+    histogramas = {c: [n_usuarios] + [0] * (NUM_FAIXAS - 1) for c in COLUNAS_PONTOS}
+    return histogramas
+
+def obter_histogramas():
+    if histogramas is None:
+        reconstruir_histogramas(carregar_df_usuarios())
+    return histogramas
+
+def atualizar_histogramas(antes, depois):
+    # antes/depois: pontos do usuário por coluna; antes=None para conta nova.
+    # Se ainda não foram construídos, o próximo obter_histogramas() já lê o CSV atualizado.
+    if histogramas is None:
+        return
+    for c in COLUNAS_PONTOS:
+        de = faixa_pontos(antes[c]) if antes is not None else -1
+        para = faixa_pontos(depois[c])
+        acima = histogramas[c]
+        for i in range(min(de, para) + 1, max(de, para) + 1):
+            acima[i] += 1 if para > de else -1
+
+def percentual_topo(categoria, pontos):
+    # Porcentagem de usuários na mesma faixa ou acima (ex.: 15 -> "top 15%").
+    # None quando a comparação não ajuda: poucos usuários, zero pontos ou abaixo da mediana
+    acima = obter_histogramas()[categoria]
+    n = acima[0]
+    if n < MIN_USUARIOS_COMPARACAO or pontos <= 0:
+        return None
+    topo = max(1, round(100 * acima[faixa_pontos(pontos)] / n))
+    if topo > 50:
+        return None
+    return topo
+
+def calcular_metas(df_semana):
+    # Meta de cada categoria: 75º percentil da última semana fechada, nunca abaixo de META_POR_CATEGORIA
+    global metas_semana
+    metas_semana = {}
+    for cat, meta_base in META_POR_CATEGORIA.items():
+        if len(df_semana) < MIN_USUARIOS_COMPARACAO:
+            metas_semana[cat] = meta_base
+        else:
+            pontos = pd.to_numeric(df_semana[cat], errors="coerce").fillna(0)
+            metas_semana[cat] = max(meta_base, int(pontos.quantile(PERCENTIL_META)))
+    return metas_semana
+
+def obter_metas():
+    if metas_semana is None:
+        hist = pd.read_csv(ARQUIVO_HISTORICO)
+        calcular_metas(hist[hist["data_iso"] == hist["data_iso"].max()])
+    return metas_semana
+
+def meta_categoria(categoria):
+    return obter_metas().get(categoria, META_POR_CATEGORIA.get(categoria, 100))
+
+def pontos_usuario(df, usuario):
+    return {c: int(df.loc[df["usuario"] == usuario, c].iloc[0]) for c in COLUNAS_PONTOS}
+
 def salvar_snapshot_historico():
 
     df = carregar_df_usuarios()
     if df.empty:
+        zerar_histogramas(0)
         return
 
     df_snapshot = df.copy()
@@ -71,10 +155,12 @@ def salvar_snapshot_historico():
     df_hist = pd.read_csv(ARQUIVO_HISTORICO)
     df_hist = pd.concat([df_hist, df_snapshot], ignore_index=True)
     df_hist.to_csv(ARQUIVO_HISTORICO, index=False)
+    calcular_metas(df_snapshot)
     df2 = df.copy()
-    for c in ["reciclagem", "agua_luz", "habitos", "gases", "total"]:
+    for c in COLUNAS_PONTOS:
         df2[c] = 0
     salvar_df_usuarios(df2)
+    zerar_histogramas(len(df2))
 
 def precisa_reset_semana():
     try:
@@ -95,9 +181,11 @@ def adicionar_pontos_usuario(usuario, categoria, pontos):
     df = carregar_df_usuarios()
     if usuario not in df["usuario"].values:
         return False
+    antes = pontos_usuario(df, usuario)
     df.loc[df["usuario"] == usuario, categoria] += pontos
     df = recalcular_total(df)
     salvar_df_usuarios(df)
+    atualizar_histogramas(antes, pontos_usuario(df, usuario))
     return True
 
 class ProjetoEcoScore(ctk.CTk):
@@ -124,6 +212,8 @@ class ProjetoEcoScore(ctk.CTk):
 
             salvar_snapshot_historico()
             registrar_reset_realizado()
+        obter_histogramas()
+        obter_metas()
 
         self._build_sidebar()
         self._build_header()
@@ -308,6 +398,7 @@ class FrameLogin(ctk.CTkFrame):
             novo = {"usuario": u, "senha": s, "reciclagem": 0, "agua_luz": 0, "habitos": 0, "gases": 0, "total": 0}
             df = pd.concat([df, pd.DataFrame([novo])], ignore_index=True)
             salvar_df_usuarios(df)
+            atualizar_histogramas(None, novo)
             messagebox.showinfo("Sucesso", "Conta criada! Faça login.")
             popup.destroy()
 
@@ -469,6 +560,10 @@ class FrameActions(ctk.CTkFrame):
             messagebox.showwarning("Aviso", "Faça login para registrar ações.")
             return
         df = carregar_df_usuarios()
+        if usuario not in df["usuario"].values:
+            messagebox.showerror("Erro", "Usuário não encontrado.")
+            return
+        antes = pontos_usuario(df, usuario)
         total_added = 0
         for text, (var, cat, pts) in self.check_vars.items():
             if var.get():
@@ -477,6 +572,7 @@ class FrameActions(ctk.CTkFrame):
         if total_added > 0:
             df = recalcular_total(df)
             salvar_df_usuarios(df)
+            atualizar_histogramas(antes, pontos_usuario(df, usuario))
             messagebox.showinfo("Sucesso", f"{total_added} pontos adicionados!")
 
             for text, (var, cat, pts) in self.check_vars.items():
@@ -558,6 +654,11 @@ class FramePerformance(ctk.CTkFrame):
         self.fig2, self.ax2 = plt.subplots(figsize=(8, 2))
         self.canvas2 = FigureCanvasTkAgg(self.fig2, master=small_chart_frame)
         self.canvas2.get_tk_widget().pack(fill="both", expand=True)
+        peers = ctk.CTkFrame(self, fg_color="#263e2d")
+        peers.pack(fill="x", padx=20, pady=(6, 0))
+        ctk.CTkLabel(peers, text="Comparação com outros usuários:", font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w", pady=(8, 4), padx=12)
+        self.peers_label = ctk.CTkLabel(peers, text="", anchor="w", justify="left")
+        self.peers_label.pack(anchor="w", pady=(0, 8), padx=12)
         bottom = ctk.CTkFrame(self, fg_color="#263e2d")
         bottom.pack(fill="x", padx=20, pady=(6, 18))
         ctk.CTkLabel(bottom, text="Dicas para melhorar:", font=ctk.CTkFont(size=14, weight="bold")).pack(anchor="w", pady=(8, 6), padx=12)
@@ -581,6 +682,8 @@ class FramePerformance(ctk.CTkFrame):
             self.ax2.text(0.5, 0.5, "Gráfico de comparação semanal indisponível (login necessário)", ha="center", va="center", fontsize=10, color="white")
             self.canvas2.draw_idle()
 
+            self.peers_label.configure(text="Faça login para ver sua comparação com outros usuários.")
+
             self.tips_box.delete("0.0", "end")
             self.tips_box.insert("0.0", "Faça login para ver dicas personalizadas.")
             return
@@ -643,9 +746,19 @@ class FramePerformance(ctk.CTkFrame):
                 self.ax2.text(0.5, 0.5, "Erro ao processar histórico.", ha="center", va="center", fontsize=10, color="white")
                 self.canvas2.draw_idle()
 
+        comparacao = []
+        for cat, label, val in zip(cats + ["total"], labels + ["Total"], values + [int(row["total"])]):
+            topo = percentual_topo(cat, val)
+            if topo is not None:
+                comparacao.append(f"{label}: você está entre os {topo}% melhores desta semana.")
+        if comparacao:
+            self.peers_label.configure(text="\n".join(comparacao))
+        else:
+            self.peers_label.configure(text="Sem comparação disponível no momento.")
+
         dicas = []
         for cat, label, val in zip(cats, labels, values):
-            meta = META_POR_CATEGORIA.get(cat, 100)
+            meta = meta_categoria(cat)
             if val < meta:
                 if cat == "reciclagem":
                     dicas.append(f" {label} — Separe lixo de papel, plástico e metal e leve a pontos de coleta.\n\n")